@@ -1,10 +1,11 @@
 import logging
-import sys
 import os
+import re
 
 import vcf
 
 from sv_interval import SVInterval
+from io_utils import open_native_file, iter_lines
 
 logger = logging.getLogger(__name__)
 
@@ -59,6 +60,15 @@ Real SV breakpoints are expected to reside within the predicted boundaries with
 breakdancer_name = "BreakDancer"
 breakdancer_source = set(["BreakDancer"])
 
+# pyvcf builds a new namedtuple class on every make_calldata_tuple call, so build the GT one once
+_Record = vcf.model._Record
+_Call = vcf.model._Call
+_SV = vcf.model._SV
+GTCallData = vcf.model.make_calldata_tuple("GT")
+
+# Matches the library|count pairs of the read pairs per library column, e.g. nA|2:tB|1
+supporting_read_pairs_lib_pattern = re.compile(r"([^|:]+)\|(\d+)")
+
 
 class BreakDancerHeader:
     def __init__(self):
@@ -78,7 +88,10 @@ class BreakDancerHeader:
         return str(self.__dict__)
 
 
-class BreakDancerRecord:
+class BreakDancerRecord(object):
+    __slots__ = ("name", "chr1", "pos1", "ori1", "chr2", "pos2", "ori2", "sv_type", "sv_len", "score",
+                 "supporting_read_pairs", "supporting_reads_pairs_lib", "info")
+
     def __init__(self, record_string):
         self.name = breakdancer_name
         fields = record_string.split()
@@ -92,8 +105,8 @@ class BreakDancerRecord:
         self.sv_len = abs(int(fields[7])) 
         self.score = float(fields[8])
         self.supporting_read_pairs = int(fields[9])
-        self.supporting_reads_pairs_lib = dict(
-            map(lambda l: (l[0], int(l[1])), (s.split("|") for s in fields[10].split(":"))))
+        self.supporting_reads_pairs_lib = {lib: int(count) for lib, count in
+                                           supporting_read_pairs_lib_pattern.findall(fields[10])}
         self.info = {
             "BD_CHR1": self.chr1,
             "BD_POS1": self.pos1,
@@ -106,10 +119,10 @@ class BreakDancerRecord:
         }
 
     def __str__(self):
-        return str(self.__dict__)
+        return str({name: getattr(self, name) for name in self.__slots__})
 
     def __repr__(self):
-        return "<" + self.__class__.__name__ + " " + str(self.__dict__) + ">"
+        return "<" + self.__class__.__name__ + " " + str(self) + ">"
 
     def to_sv_interval(self):
         if self.sv_type not in BreakDancerReader.svs_supported:
@@ -165,7 +178,7 @@ class BreakDancerRecord:
         if self.chr1 != self.chr2 and self.sv_type != "CTX":
             return None
 
-        alt = [vcf.model._SV(self.sv_type)]
+        alt = [_SV(self.sv_type)]
         sv_len = -self.sv_len if self.sv_type == "DEL" else self.sv_len
         info = {"SVLEN": sv_len,
                 "SVTYPE": self.sv_type}
@@ -181,17 +194,17 @@ class BreakDancerRecord:
 
         info.update(self.info)
 
-        vcf_record = vcf.model._Record(self.chr1,
-                                       self.pos1,
-                                       ".",
-                                       "N",
-                                       alt,
-                                       ".",
-                                       ".",
-                                       info,
-                                       "GT",
-                                       [0],
-                                       [vcf.model._Call(None, sample, vcf.model.make_calldata_tuple("GT")(GT="1/1"))])
+        vcf_record = _Record(self.chr1,
+                             self.pos1,
+                             ".",
+                             "N",
+                             alt,
+                             ".",
+                             ".",
+                             info,
+                             "GT",
+                             [0],
+                             [_Call(None, sample, GTCallData(GT="1/1"))])
         return vcf_record
 
 
@@ -200,7 +213,7 @@ class BreakDancerReader:
 
     def __init__(self, file_name, reference_handle=None, svs_to_report=None):
         logger.info("File is " + str(file_name))
-        self.file_fd = open(file_name) if file_name is not None else sys.stdin
+        self.file_fd = open_native_file(file_name)
         self.header = BreakDancerHeader()
         self.reference_handle = reference_handle
         self.svs_supported = BreakDancerReader.svs_supported
@@ -208,16 +221,13 @@ class BreakDancerReader:
             self.svs_supported &= set(svs_to_report)
 
     def __iter__(self):
-        return self
-
-    def next(self):
-        while True:
-            line = self.file_fd.next().strip()
+        for line in iter_lines(self.file_fd):
+            line = line.strip()
             if line:
                 if line[0] != "#":
                     record = BreakDancerRecord(line)
                     if record.sv_type in self.svs_supported:
-                        return record
+                        yield record
                 else:
                     self.header.parse_header_line(line)
 
@@ -0,0 +1,26 @@
+import sys
+
+READ_BUFFER_SIZE = 4 << 20
+READ_CHUNK_SIZE = 1 << 20
+
+
+def open_native_file(file_name):
+    return open(file_name, "rb", READ_BUFFER_SIZE) if file_name is not None else sys.stdin
+
+
+def iter_lines(fd, chunk_size=READ_CHUNK_SIZE):
+    """Yield the lines of fd without the trailing newline, reading chunk_size bytes at a time.
+
+    Large native outputs are read with far fewer calls than the line-at-a-time iteration of file objects.
+    """
+    partial = ""
+    while True:
+        chunk = fd.read(chunk_size)
+        if not chunk:
+            break
+        lines = (partial + chunk).split("\n")
+        partial = lines.pop()
+        for line in lines:
+            yield line
+    if partial:
+        yield partial
@@ -5,7 +5,7 @@ import sys
 from defaults import *
 from vcf_utils import *
 from sv_interval import SVInterval, get_gaps_file, interval_overlaps_interval_list, merge_intervals, merge_intervals_recursively
-from pindel_reader import PindelReader
+from pindel_reader import PindelReader, pindel_records_to_intervals
 from breakdancer_reader import BreakDancerReader
 from breakseq_reader import BreakSeqReader
 from cnvnator_reader import CNVnatorReader
@@ -103,8 +103,13 @@ def run_metasv(args):
         intervals[toolname] = defaultdict(list)
 
         for native_file in nativename:
-            for record in svReader(native_file, svs_to_report=args.svs_to_report):
-                interval = record.to_sv_interval()
+            if svReader is PindelReader:
+                native_intervals = pindel_records_to_intervals(
+                    PindelReader.read_all(native_file, svs_to_report=args.svs_to_report))
+            else:
+                native_intervals = (record.to_sv_interval() for record in
+                                    svReader(native_file, svs_to_report=args.svs_to_report))
+            for interval in native_intervals:
                 if not interval:
                     # This is the case for SVs we want to skip
                     continue
@@ -1,10 +1,13 @@
 import logging
+import multiprocessing
 import sys
 import os
+from collections import defaultdict
 
 import vcf
 
 from sv_interval import SVInterval
+from io_utils import open_native_file, iter_lines
 
 logger = logging.getLogger(__name__)
 
@@ -105,123 +108,154 @@ GT_HOM = "1/1"
 
 PINDEL_TO_SV_TYPE = {"I": "INS", "D": "DEL", "LI": "INS", "TD": "DUP", "INV": "INV"}
 
-
-class PindelRecord:
-    def __init__(self, record_string, reference_handle=None):
-        fields = record_string.split()
-        self.sv_type = fields[1]
-        self.name = pindel_name
-
-        self.sv_len = None
-        self.num_nt_added = None
-        self.nt_added = None
-        self.chromosome = None
-        self.start_pos = None
-        self.end_pos = None
-        self.bp_range = None
-        self.read_supp = None
-        self.uniq_read_supp = None
-        self.up_read_supp = None
-        self.up_uniq_read_supp = None
-        self.down_read_supp = None
-        self.down_uniq_read_supp = None
-        self.simple_score = None
-        self.sum_mapq = None
-        self.num_sample = None
-        self.num_sample_supp = None
-        self.num_sample_uniq_supp = None
-        self.homlen = None
-        self.homseq = None
-        self.samples = None
-
-        if self.sv_type != "LI":
-            self.sv_len = int(fields[2])
-            self.num_nt_added = map(int, fields[4].split(":"))
-            self.nt_added = map(lambda x: x.replace('"', ''), fields[5].split(":"))
-            self.chromosome = fields[7]
-            self.start_pos = int(fields[9])
-            self.end_pos = int(fields[10]) - 1
-            self.bp_range = (int(fields[12]), int(fields[13]))
-            self.read_supp = int(fields[15])  # The number of reads supporting the SV
-            self.uniq_read_supp = int(
-                fields[16])  # The number of unique reads supporting SV (not count duplicate reads)
-            self.up_read_supp = int(fields[18])  # upstream
-            self.up_uniq_read_supp = int(fields[19])
-            self.down_read_supp = int(fields[21])  # downstream
-            self.down_uniq_read_supp = int(fields[22])
-            self.simple_score = int(fields[24])
-            self.sum_mapq = int(fields[26])  # sum of mapping qualities of anchor reads
-            self.num_sample = int(fields[27])  # number of samples
-            self.num_sample_supp = int(fields[29])  # number of samples with supporting reads
-            self.num_sample_uniq_supp = int(fields[30])  # number of sample with unique supporting readas
-            self.homlen = self.bp_range[1] - self.end_pos
-            self.homseq = reference_handle.fetch(self.chromosome, self.end_pos - 1,
-                                                 self.bp_range[1] - 1) if reference_handle else ""
-            pindel024u_or_later = len(fields) > 31 + 5 * self.num_sample
-            if pindel024u_or_later:
-                self.samples = self.samples = [{"name": fields[i], "ref_support_at_start": int(fields[i + 1]),
-                                                "ref_support_at_end": int(fields[i + 2]),
-                                                "plus_support": sum(map(int, fields[i + 3:i + 5])),
-                                                "minus_support": sum(map(int, fields[i + 5:i + 7]))} for i in
-                                               xrange(31, len(fields), 7)]
-            else:
-                self.samples = [{"name": fields[i], "ref_support_at_start": int(fields[i + 1]),
-                                 "ref_support_at_end": int(fields[i + 2]), "plus_support": int(fields[i + 3]),
-                                 "minus_support": int(fields[i + 4])} for i in xrange(31, len(fields), 5)]
-        else:
-            self.sv_len = 0
-            self.chromosome = fields[3]
-            self.start_pos = min(int(fields[4]), int(fields[7]))
-            self.up_read_supp = int(fields[6])  # upstream
-            self.end_pos = self.start_pos
-            self.down_read_supp = int(fields[9])  # downstream
-            self.bp_range = (self.start_pos, self.end_pos)
-            self.homlen = 0
-            self.homseq = ""
-            self.samples = [{"name": fields[i], "plus_support": int(fields[i + 2]), "minus_support": int(fields[i + 4])}
-                            for i in xrange(10, len(fields), 5)]
-
-        self.info = {
-            "END": self.end_pos,
-            "PD_NUM_NT_ADDED": self.num_nt_added,
-            "PD_NT_ADDED": self.nt_added,
-            "PD_BP_RANGE_START": self.bp_range[0],
-            "PD_BP_RANGE_END": self.bp_range[1],
-            "PD_READ_SUPP": self.read_supp,
-            "PD_UNIQ_READ_SUPP": self.uniq_read_supp,
-            "PD_UP_READ_SUPP": self.up_read_supp,
-            "PD_UP_UNIQ_READ_SUPP": self.up_uniq_read_supp,
-            "PD_DOWN_READ_SUPP": self.down_read_supp,
-            "PD_DOWN_UNIQ_READ_SUPP": self.down_uniq_read_supp,
-            "PD_SIMPLE_SCORE": self.simple_score,
-            "PD_SUM_MAPQ": self.sum_mapq,
-            "PD_NUM_SAMPLE": self.num_sample,
-            "PD_NUM_SAMPLE_SUPP": self.num_sample_supp,
-            "PD_NUM_SAMPLE_UNIQ_SUPP": self.num_sample_uniq_supp,
-            "PD_HOMLEN": self.homlen,
-            "PD_HOMSEQ": self.homseq
-        }
-
-        self.derive_genotype()
-
-    def derive_genotype(self):
-        if self.sv_type == "LI" or self.sv_type == "I":
-            self.gt = GT_HET if (self.up_read_supp + self.down_read_supp) > 0 else GT_REF
-            return
-
-        total_event_reads = self.uniq_read_supp
-        total_ref_reads = self.up_uniq_read_supp + self.down_uniq_read_supp
-        if total_event_reads + total_ref_reads < min_coverage:
-            self.gt = GT_REF
-            return
-
-        allele_fraction = float(total_event_reads) / (float(total_event_reads) + float(total_ref_reads))
-        if allele_fraction < het_cutoff:
-            self.gt = GT_REF
-        elif allele_fraction < hom_cutoff:
-            self.gt = GT_HET
+# pyvcf builds a new namedtuple class on every make_calldata_tuple call, so build the GT one once
+_Record = vcf.model._Record
+_Call = vcf.model._Call
+_SV = vcf.model._SV
+GTCallData = vcf.model.make_calldata_tuple("GT")
+
+# Number of splits done up front on a record line, covering the fixed fields. The per-sample fields after them
+# are left as a single unsplit field until the samples are asked for.
+PINDEL_MAX_SPLIT = 31
+
+# Largest stretch of reference fetched at once when looking up the homology sequences of a batch of records
+HOMSEQ_FETCH_SPAN = 1000000
+
+
+def derive_genotype(sv_type, up_read_supp, down_read_supp, uniq_read_supp, up_uniq_read_supp, down_uniq_read_supp,
+                    min_coverage=min_coverage, het_cutoff=het_cutoff, hom_cutoff=hom_cutoff):
+    if sv_type == "LI" or sv_type == "I":
+        return GT_HET if (up_read_supp + down_read_supp) > 0 else GT_REF
+
+    total_event_reads = uniq_read_supp
+    total_ref_reads = up_uniq_read_supp + down_uniq_read_supp
+    if total_event_reads + total_ref_reads < min_coverage:
+        return GT_REF
+
+    allele_fraction = float(total_event_reads) / (float(total_event_reads) + float(total_ref_reads))
+    if allele_fraction < het_cutoff:
+        return GT_REF
+    elif allele_fraction < hom_cutoff:
+        return GT_HET
+    return GT_HOM
+
+
+def derive_genotypes(records):
+    """Genotype a batch of PindelRecords in a single loop.
+
+    Applies the same rule as derive_genotype, inlined with the cutoffs bound to locals so that no function
+    call is made per record.
+    """
+    gt_ref, gt_het, gt_hom = GT_REF, GT_HET, GT_HOM
+    coverage_cutoff, het_af_cutoff, hom_af_cutoff = min_coverage, het_cutoff, hom_cutoff
+    for record in records:
+        sv_type = record.sv_type
+        if sv_type == "LI" or sv_type == "I":
+            record.gt = gt_het if (record.up_read_supp + record.down_read_supp) > 0 else gt_ref
+            continue
+
+        total_event_reads = record.uniq_read_supp
+        total_reads = total_event_reads + record.up_uniq_read_supp + record.down_uniq_read_supp
+        if total_reads < coverage_cutoff:
+            record.gt = gt_ref
+            continue
+
+        # Compares the event reads against the cutoffs scaled by the total instead of computing the allele fraction
+        if total_event_reads < het_af_cutoff * total_reads:
+            record.gt = gt_ref
+        elif total_event_reads < hom_af_cutoff * total_reads:
+            record.gt = gt_het
         else:
-            self.gt = GT_HOM
+            record.gt = gt_hom
+    return records
+
+
+def fetch_homseqs(records, reference_handle, max_span=HOMSEQ_FETCH_SPAN):
+    """Look up the homology sequences of a batch of PindelRecords.
+
+    Records close to each other on a chromosome share a single reference fetch spanning up to max_span bases,
+    and their sequences are sliced out of it, instead of fetching once per record.
+    """
+    records_by_chromosome = defaultdict(list)
+    for record in records:
+        if record.sv_type != "LI":
+            records_by_chromosome[record.chromosome].append(record)
+
+    for chromosome, chromosome_records in records_by_chromosome.iteritems():
+        chromosome_records.sort(key=lambda record: record.end_pos)
+        window_start = 0
+        while window_start < len(chromosome_records):
+            lo = chromosome_records[window_start].end_pos - 1
+            hi = chromosome_records[window_start].bp_range[1] - 1
+            window_end = window_start + 1
+            while window_end < len(chromosome_records) and \
+                            max(hi, chromosome_records[window_end].bp_range[1] - 1) - lo <= max_span:
+                hi = max(hi, chromosome_records[window_end].bp_range[1] - 1)
+                window_end += 1
+
+            reference_seq = reference_handle.fetch(chromosome, lo, hi)
+            for record in chromosome_records[window_start:window_end]:
+                record.homseq = reference_seq[record.end_pos - 1 - lo:record.bp_range[1] - 1 - lo]
+            window_start = window_end
+    return records
+
+
+def parse_pindel_record(record_string, reference_handle=None):
+    """Build the PindelRecord of the right kind for a record line"""
+    fields = record_string.split(None, PINDEL_MAX_SPLIT)
+    if fields[1] == "LI":
+        return PindelRecordLI(fields, reference_handle)
+    return PindelRecordSV(fields, reference_handle)
+
+
+class PindelRecord(object):
+    """Base of the Pindel records, built from the fields of a record line by parse_pindel_record.
+
+    Only the fields needed for genotyping and for the intervals are parsed when a record is built. The rest are
+    parsed from the kept fields when asked for. The SV type and the chromosome only take a handful of values, so
+    they are interned to share one string between all the records.
+    """
+    __slots__ = ("sv_type", "sv_len", "chromosome", "start_pos", "end_pos", "bp_range", "up_read_supp",
+                 "down_read_supp", "homlen", "gt", "_fields", "_reference_handle", "_samples", "_info")
+
+    name = pindel_name
+
+    # Attributes reported by __str__, including the lazily parsed ones
+    attributes = ("sv_type", "name", "sv_len", "num_nt_added", "nt_added", "chromosome", "start_pos", "end_pos",
+                  "bp_range", "read_supp", "uniq_read_supp", "up_read_supp", "up_uniq_read_supp", "down_read_supp",
+                  "down_uniq_read_supp", "simple_score", "sum_mapq", "num_sample", "num_sample_supp",
+                  "num_sample_uniq_supp", "homlen", "homseq", "samples", "info", "gt")
+
+    def _sample_fields(self, start):
+        fields = self._fields
+        if len(fields) > PINDEL_MAX_SPLIT:
+            return fields[start:PINDEL_MAX_SPLIT] + fields[PINDEL_MAX_SPLIT].split()
+        return fields[start:]
+
+    @property
+    def info(self):
+        if self._info is None:
+            self._info = {
+                "END": self.end_pos,
+                "PD_NUM_NT_ADDED": self.num_nt_added,
+                "PD_NT_ADDED": self.nt_added,
+                "PD_BP_RANGE_START": self.bp_range[0],
+                "PD_BP_RANGE_END": self.bp_range[1],
+                "PD_READ_SUPP": self.read_supp,
+                "PD_UNIQ_READ_SUPP": self.uniq_read_supp,
+                "PD_UP_READ_SUPP": self.up_read_supp,
+                "PD_UP_UNIQ_READ_SUPP": self.up_uniq_read_supp,
+                "PD_DOWN_READ_SUPP": self.down_read_supp,
+                "PD_DOWN_UNIQ_READ_SUPP": self.down_uniq_read_supp,
+                "PD_SIMPLE_SCORE": self.simple_score,
+                "PD_SUM_MAPQ": self.sum_mapq,
+                "PD_NUM_SAMPLE": self.num_sample,
+                "PD_NUM_SAMPLE_SUPP": self.num_sample_supp,
+                "PD_NUM_SAMPLE_UNIQ_SUPP": self.num_sample_uniq_supp,
+                "PD_HOMLEN": self.homlen,
+                "PD_HOMSEQ": self.homseq
+            }
+        return self._info
 
     def to_sv_interval(self):
         sv_type = PINDEL_TO_SV_TYPE[self.sv_type]
@@ -252,26 +286,153 @@ class PindelRecord:
                               gt=self.gt)
 
     def to_vcf_record(self, sample):
-        alt = [vcf.model._SV(PINDEL_TO_SV_TYPE[self.sv_type])]
+        alt = [_SV(PINDEL_TO_SV_TYPE[self.sv_type])]
         info = {"SVLEN": self.sv_len, "SVTYPE": PINDEL_TO_SV_TYPE[self.sv_type]}
 
         info.update(self.info)
 
-        vcf_record = vcf.model._Record(self.chromosome,
-                                       self.start_pos - 1,
-                                       ".",
-                                       "N",
-                                       alt,
-                                       ".",
-                                       ".",
-                                       info,
-                                       "GT",
-                                       [0],
-                                       [vcf.model._Call(None, sample, vcf.model.make_calldata_tuple("GT")(GT=self.gt))])
+        vcf_record = _Record(self.chromosome,
+                             self.start_pos - 1,
+                             ".",
+                             "N",
+                             alt,
+                             ".",
+                             ".",
+                             info,
+                             "GT",
+                             [0],
+                             [_Call(None, sample, GTCallData(GT=self.gt))])
         return vcf_record
 
     def __str__(self):
-        return str(self.__dict__)
+        return str({name: getattr(self, name) for name in self.attributes})
+
+
+class PindelRecordSV(PindelRecord):
+    """Pindel record of the I, D, INV and TD types"""
+    __slots__ = ("read_supp", "uniq_read_supp", "up_uniq_read_supp", "down_uniq_read_supp", "simple_score",
+                 "sum_mapq", "num_sample", "num_sample_supp", "num_sample_uniq_supp", "_num_nt_added", "_nt_added",
+                 "_homseq")
+
+    def __init__(self, fields, reference_handle=None):
+        self._fields = fields
+        self._reference_handle = reference_handle
+        self.sv_type = intern(fields[1])
+        self.sv_len = int(fields[2])
+        self.chromosome = intern(fields[7])
+        self.start_pos = int(fields[9])
+        self.end_pos = int(fields[10]) - 1
+        self.bp_range = (int(fields[12]), int(fields[13]))
+        self.read_supp = int(fields[15])  # The number of reads supporting the SV
+        self.uniq_read_supp = int(
+            fields[16])  # The number of unique reads supporting SV (not count duplicate reads)
+        self.up_read_supp = int(fields[18])  # upstream
+        self.up_uniq_read_supp = int(fields[19])
+        self.down_read_supp = int(fields[21])  # downstream
+        self.down_uniq_read_supp = int(fields[22])
+        self.simple_score = int(fields[24])
+        self.sum_mapq = int(fields[26])  # sum of mapping qualities of anchor reads
+        self.num_sample = int(fields[27])  # number of samples
+        self.num_sample_supp = int(fields[29])  # number of samples with supporting reads
+        self.num_sample_uniq_supp = int(fields[30])  # number of sample with unique supporting readas
+        self.homlen = self.bp_range[1] - self.end_pos
+        self.gt = None
+        self._num_nt_added = None
+        self._nt_added = None
+        self._homseq = None
+        self._samples = None
+        self._info = None
+
+    @property
+    def num_nt_added(self):
+        if self._num_nt_added is None:
+            self._num_nt_added = [int(num_nt) for num_nt in self._fields[4].split(":")]
+        return self._num_nt_added
+
+    @property
+    def nt_added(self):
+        if self._nt_added is None:
+            self._nt_added = self._fields[5].replace('"', '').split(":")
+        return self._nt_added
+
+    @property
+    def homseq(self):
+        if self._homseq is None:
+            self._homseq = self._reference_handle.fetch(self.chromosome, self.end_pos - 1,
+                                                        self.bp_range[1] - 1) if self._reference_handle else ""
+        return self._homseq
+
+    @homseq.setter
+    def homseq(self, homseq):
+        self._homseq = homseq
+        if self._info is not None:
+            self._info["PD_HOMSEQ"] = homseq
+
+    @property
+    def samples(self):
+        if self._samples is None:
+            fields = self._sample_fields(31)
+            if len(fields) > 5 * self.num_sample:  # Pindel 0.2.4u or later
+                self._samples = [{"name": fields[i], "ref_support_at_start": int(fields[i + 1]),
+                                  "ref_support_at_end": int(fields[i + 2]),
+                                  "plus_support": sum(map(int, fields[i + 3:i + 5])),
+                                  "minus_support": sum(map(int, fields[i + 5:i + 7]))} for i in
+                                 xrange(0, len(fields), 7)]
+            else:
+                self._samples = [{"name": fields[i], "ref_support_at_start": int(fields[i + 1]),
+                                  "ref_support_at_end": int(fields[i + 2]), "plus_support": int(fields[i + 3]),
+                                  "minus_support": int(fields[i + 4])} for i in xrange(0, len(fields), 5)]
+        return self._samples
+
+    def derive_genotype(self):
+        self.gt = derive_genotype(self.sv_type, self.up_read_supp, self.down_read_supp, self.uniq_read_supp,
+                                  self.up_uniq_read_supp, self.down_uniq_read_supp)
+
+
+class PindelRecordLI(PindelRecord):
+    """Pindel record of a large insertion (LI), which only reports the breakpoints and their support"""
+    __slots__ = ()
+
+    # Fields which are not reported for large insertions
+    num_nt_added = None
+    nt_added = None
+    read_supp = None
+    uniq_read_supp = None
+    up_uniq_read_supp = None
+    down_uniq_read_supp = None
+    simple_score = None
+    sum_mapq = None
+    num_sample = None
+    num_sample_supp = None
+    num_sample_uniq_supp = None
+    homseq = ""
+
+    def __init__(self, fields, reference_handle=None):
+        self._fields = fields
+        self._reference_handle = reference_handle
+        self.sv_type = intern(fields[1])
+        self.sv_len = 0
+        self.chromosome = intern(fields[3])
+        self.start_pos = min(int(fields[4]), int(fields[7]))
+        self.up_read_supp = int(fields[6])  # upstream
+        self.end_pos = self.start_pos
+        self.down_read_supp = int(fields[9])  # downstream
+        self.bp_range = (self.start_pos, self.end_pos)
+        self.homlen = 0
+        self.gt = None
+        self._samples = None
+        self._info = None
+
+    @property
+    def samples(self):
+        if self._samples is None:
+            fields = self._sample_fields(10)
+            self._samples = [{"name": fields[i], "plus_support": int(fields[i + 2]),
+                              "minus_support": int(fields[i + 4])} for i in xrange(0, len(fields), 5)]
+        return self._samples
+
+    def derive_genotype(self):
+        self.gt = GT_HET if (self.up_read_supp + self.down_read_supp) > 0 else GT_REF
 
 
 class PindelReader:
@@ -279,19 +440,125 @@ class PindelReader:
 
     def __init__(self, file_name, reference_handle=None, svs_to_report=None):
         logger.info("File is " + str(file_name))
-        self.file_fd = open(file_name) if file_name is not None else sys.stdin
+        self.file_fd = open_native_file(file_name)
         self.reference_handle = reference_handle
         self.svs_supported = PindelReader.svs_supported
         if svs_to_report is not None:
             self.svs_supported &= set(svs_to_report)
 
-    def __iter__(self):
-        return self
+    @classmethod
+    def read_all(cls, file_name, reference_handle=None, svs_to_report=None):
+        """Parse all the records of a Pindel output in one pass over the file.
 
-    def next(self):
-        while True:
-            line = self.file_fd.next()
-            if line.find("ChrID") >= 1:
-                record = PindelRecord(line.strip(), self.reference_handle)
+        The record lines are filtered out in a single list comprehension before any parsing is done,
+        and the records are then genotyped and given their homology sequences as one batch. Iterating
+        over a PindelReader is still the way to go when the records should not all be held in memory.
+        """
+        logger.info("File is " + str(file_name))
+        svs_supported = cls.svs_supported if svs_to_report is None else cls.svs_supported & set(svs_to_report)
+
+        pindel_fd = open_native_file(file_name)
+        record_lines = [line for line in iter_lines(pindel_fd) if "ChrID" in line]
+        if pindel_fd is not sys.stdin:
+            pindel_fd.close()
+
+        # The homology sequences are looked up for the whole batch below rather than record by record
+        records = [parse_pindel_record(line) for line in record_lines]
+        records = [record for record in records if PINDEL_TO_SV_TYPE[record.sv_type] in svs_supported]
+        if reference_handle:
+            fetch_homseqs(records, reference_handle)
+        return derive_genotypes(records)
+
+    def __iter__(self):
+        for line in iter_lines(self.file_fd):
+            if "ChrID" in line:
+                record = parse_pindel_record(line.strip(), self.reference_handle)
                 if PINDEL_TO_SV_TYPE[record.sv_type] in self.svs_supported:
-                    return record
+                    record.derive_genotype()
+                    yield record
+
+
+def pindel_records_to_intervals(records):
+    """Convert a batch of PindelRecords to SVIntervals, skipping the SV types which are not supported.
+
+    Gives the same intervals as calling to_sv_interval() on every record, but with the lookups hoisted out of the loop.
+    """
+    svs_supported = PindelReader.svs_supported
+    sv_type_map = PINDEL_TO_SV_TYPE
+    source = pindel_source
+
+    intervals = []
+    append = intervals.append
+    for record in records:
+        sv_type = sv_type_map[record.sv_type]
+        if sv_type not in svs_supported:
+            continue
+
+        if sv_type != "INS":
+            append(SVInterval(record.chromosome, record.start_pos, record.end_pos, name=record.name,
+                              sv_type=sv_type, length=record.sv_len, sources=source, info=record.info,
+                              native_sv=record))
+        else:
+            append(SVInterval(record.chromosome, record.start_pos, record.start_pos, record.name,
+                              sv_type=sv_type, length=record.sv_len, sources=source, native_sv=record,
+                              wiggle=100, info=record.info, gt=record.gt))
+    return intervals
+
+
+def format_vcf_info_value(value):
+    if isinstance(value, list):
+        return ",".join("." if item is None else str(item) for item in value)
+    return "." if value is None else str(value)
+
+
+def format_vcf_lines(rows, info_keys):
+    """Format VCF lines for (chromosome, start_pos, sv_type, sv_len, info, gt) rows of PindelRecords.
+
+    The INFO keys are written in the order of info_keys.
+    """
+    format_value = format_vcf_info_value
+    sv_type_map = PINDEL_TO_SV_TYPE
+
+    lines = []
+    for chromosome, start_pos, pindel_sv_type, sv_len, record_info, gt in rows:
+        sv_type = sv_type_map[pindel_sv_type]
+        info = {"SVLEN": sv_len, "SVTYPE": sv_type}
+        info.update(record_info)
+        lines.append("%s\t%d\t.\tN\t<%s>\t.\t.\t%s\tGT\t%s\n" % (
+            chromosome, start_pos - 1, sv_type, ";".join("%s=%s" % (key, format_value(info[key])) for key in info_keys),
+            gt or "."))
+    return "".join(lines)
+
+
+def write_vcf_records(records, sample, vcf_writer, nthreads=1):
+    """Write a batch of PindelRecords to the VCF of vcf_writer, with the VCF lines formatted directly.
+
+    Gives the same lines as vcf_writer.write_record(record.to_vcf_record(sample)) for each record, but the INFO
+    keys are put in the header order once for the whole batch rather than per record, and all the lines are written
+    out together. With nthreads > 1, the lines are formatted by a pool of processes over contiguous slices of the
+    records, and written out in the original order.
+    """
+    if not records:
+        return
+
+    # All the records carry the same INFO keys
+    info_keys = sorted(["SVLEN", "SVTYPE"] + records[0].info.keys(),
+                       key=lambda key: (vcf_writer.info_order[key], key))
+
+    # The INFO and homology sequences are resolved here, so that the workers are only sent plain values
+    rows = [(record.chromosome, record.start_pos, record.sv_type, record.sv_len, record.info, record.gt) for record
+            in records]
+
+    nthreads = min(len(rows), nthreads)
+    if nthreads <= 1:
+        vcf_writer.stream.write(format_vcf_lines(rows, info_keys))
+        return
+
+    rows_per_process = (len(rows) + nthreads - 1) / nthreads
+    pool = multiprocessing.Pool(nthreads)
+    results = [pool.apply_async(format_vcf_lines, args=[rows[i * rows_per_process: (i + 1) * rows_per_process],
+                                                         info_keys]) for i in xrange(nthreads)]
+    pool.close()
+    for result in results:
+        vcf_writer.stream.write(result.get())
+    pool.join()
@@ -7,7 +7,7 @@ import vcf
 import pysam
 
 from metasv.breakdancer_reader import BreakDancerReader
-from metasv.pindel_reader import PindelReader
+from metasv.pindel_reader import PindelReader, write_vcf_records
 from metasv.cnvnator_reader import CNVnatorReader
 from metasv.breakseq_reader import BreakSeqReader
 from metasv.vcf_utils import get_template
@@ -20,7 +20,8 @@ tool_to_reader = {"BreakDancer": BreakDancerReader, "Pindel": PindelReader, "CNV
                   "BreakSeq": BreakSeqReader}
 
 
-def convert_svtool_to_vcf(file_name, sample, out_vcf, toolname, reference, sort=False, index=False):
+def convert_svtool_to_vcf(file_name, sample, out_vcf, toolname, reference, sort=False, index=False, legacy=False,
+                          nthreads=1):
     vcf_template_reader = get_template()
     vcf_template_reader.samples = [sample]
 
@@ -35,26 +36,32 @@ def convert_svtool_to_vcf(file_name, sample, out_vcf, toolname, reference, sort=
         else:
             logger.info("Chromosomes will be sorted by the reference order")
 
-    vcf_records = []
-    for tool_record in tool_to_reader[toolname](file_name, reference_handle=reference_handle):
-        vcf_record = tool_record.to_vcf_record(sample)
-        if vcf_record is None:
-            continue
-        if sort:
-            vcf_records.append(vcf_record)
-        else:
-            vcf_writer.write_record(vcf_record)
-
     if sort:
         if reference_contigs:
             contigs_order_dict = {contig.name: index for (index, contig) in enumerate(reference_contigs)}
-            vcf_records.sort(
-                cmp=lambda x, y: cmp((contigs_order_dict[x.CHROM], x.POS), (contigs_order_dict[y.CHROM], y.POS)))
+            chrom_key = lambda chrom: contigs_order_dict[chrom]
         else:
-            vcf_records.sort(cmp=lambda x, y: cmp((x.CHROM, x.POS), (y.CHROM, y.POS)))
+            chrom_key = lambda chrom: chrom
 
-        for vcf_record in vcf_records:
-            vcf_writer.write_record(vcf_record)
+    if toolname == "Pindel" and not legacy:
+        pindel_records = PindelReader.read_all(file_name, reference_handle=reference_handle)
+        if sort:
+            pindel_records.sort(key=lambda record: (chrom_key(record.chromosome), record.start_pos - 1))
+        write_vcf_records(pindel_records, sample, vcf_writer, nthreads=nthreads)
+    else:
+        vcf_records = []
+        # Either keep or write out the converted records, looked up once outside the loop
+        emit_record = vcf_records.append if sort else vcf_writer.write_record
+        for tool_record in tool_to_reader[toolname](file_name, reference_handle=reference_handle):
+            vcf_record = tool_record.to_vcf_record(sample)
+            if vcf_record is None:
+                continue
+            emit_record(vcf_record)
+
+        if sort:
+            vcf_records.sort(key=lambda vcf_record: (chrom_key(vcf_record.CHROM), vcf_record.POS))
+            for vcf_record in vcf_records:
+                vcf_writer.write_record(vcf_record)
     vcf_writer.close()
     if out_vcf and index:
         pysam.tabix_index(out_vcf, force=True, preset='vcf')
@@ -71,7 +78,10 @@ if __name__ == "__main__":
     parser.add_argument("--reference", help="Reference FASTA")
     parser.add_argument("--sort", action="store_true", help="Sort the VCF records before writing")
     parser.add_argument("--index", action="store_true", help="Tabix compress and index the output VCF")
+    parser.add_argument("--legacy", action="store_true",
+                        help="Write Pindel records one at a time through pyvcf instead of formatting them in a batch")
+    parser.add_argument("--nthreads", help="Number of processes formatting the Pindel VCF lines", type=int, default=1)
 
     args = parser.parse_args()
     convert_svtool_to_vcf(args.input, args.sample, args.output, args.tool, args.reference, sort=args.sort,
-                          index=args.index)
+                          index=args.index, legacy=args.legacy, nthreads=args.nthreads)